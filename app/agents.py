@@ -1,4 +1,5 @@
 from typing import Any, Dict, List, Union
+import numpy as np
 from .tools import BaseTool, DataFetcher, ChartGenerator
 
 
@@ -10,16 +11,20 @@ TOOL_REGISTRY = {
 
 class BaseAgent:
     name = "base"
+    # True only for agents whose output depends solely on (params, tools, inputs);
+    # the orchestrator memoizes results of those across runs.
+    cacheable = False
 
     def __init__(self, params: Dict[str, Any] | None = None, tools: List[BaseTool] | None = None):
         self.params = params or {}
         self.tools = tools or []
+        # first tool wins on duplicate names, same as the old linear scan
+        self._tools_by_name: Dict[str, BaseTool] = {}
+        for t in self.tools:
+            self._tools_by_name.setdefault(getattr(t, "name", None), t)
 
     def get_tool(self, name: str) -> BaseTool | None:
-        for t in self.tools:
-            if getattr(t, "name", None) == name:
-                return t
-        return None
+        return self._tools_by_name.get(name)
 
     async def run(self, **inputs) -> Dict[str, Any]:
         raise NotImplementedError
@@ -27,6 +32,7 @@ class BaseAgent:
 
 class EchoAgent(BaseAgent):
     name = "echo"
+    cacheable = True
     async def run(self, **inputs):
         try:
             return {"echo": inputs or {}, "params": self.params}
@@ -34,33 +40,63 @@ class EchoAgent(BaseAgent):
             return {"error": f"EchoAgent failed: {repr(e)}"}
 
 
+# Below this many numbers the builtin sum() is cheaper than building a NumPy array.
+NUMPY_SUM_THRESHOLD = 64
+
+
 class SumAgent(BaseAgent):
     name = "sum"
+    cacheable = True
     async def run(self, numbers: Union[List[int], List[float]] = None):
         try:
             if not numbers:
                 return {"error": "no numbers provided"}
-            total = sum(numbers)
+            total = None
+            if len(numbers) >= NUMPY_SUM_THRESHOLD and isinstance(numbers[0], (int, float)):
+                arr = np.asarray(numbers)
+                # only plain int/float arrays; bools, huge ints (object dtype) etc. use sum().
+                kind = arr.dtype.kind
+                if kind == "f":
+                    # NumPy also infers float64 for all-int lists spanning int64/uint64
+                    # (e.g. [-1, 2**63]); those need sum() to stay exact ints.
+                    use_numpy = any(isinstance(x, float) for x in numbers)
+                else:
+                    # Integer sums must provably fit in int64, since NumPy wraps silently.
+                    use_numpy = kind in "iu" and max(int(arr.max()), -int(arr.min())) * len(arr) < 2**63
+                if use_numpy:
+                    total = arr.sum().item()
+            if total is None:
+                total = sum(numbers)
             return {"sum": total, "params": self.params}
         except Exception as e:
             return {"error": f"SumAgent failed: {repr(e)}"}
 
 
+# Response headers HttpGetAgent reports unless params["headers_include"] overrides them.
+DEFAULT_HEADERS_INCLUDE = ["content-type", "content-length"]
+
+
 class HttpGetAgent(BaseAgent):
     name = "http_get"
+    cacheable = False  # remote content changes and fetch failures must not stick
     async def run(self, url: str):
         try:
             fetcher = self.get_tool("data_fetcher")
             if not fetcher:
                 return {"error": "data_fetcher tool not configured"}
 
-            resp = await fetcher(url=url)
+            headers_include = self.params.get("headers_include", DEFAULT_HEADERS_INCLUDE)
+            if isinstance(headers_include, str):
+                headers_include = [headers_include]
+            elif not isinstance(headers_include, list) or not all(isinstance(h, str) for h in headers_include):
+                return {"error": "headers_include must be a header name or a list of header names"}
+            resp = await fetcher(url=url, return_mode="length", headers_include=headers_include)
             if not isinstance(resp, dict):
                 return {"error": "invalid fetcher response", "raw": str(resp)}
 
             return {
                 "status": resp.get("status"),
-                "length": len(resp.get("text") or ""),
+                "length": resp.get("length") or 0,
                 "headers": resp.get("headers", {}),
             }
         except Exception as e:
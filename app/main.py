@@ -1,39 +1,129 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.openapi.utils import validation_error_definition, validation_error_response_definition
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import Dict, Any
 import asyncio
+import re
 import uuid
+import msgspec
+from cachetools import TTLCache
+
+try:
+    import uvloop  # libuv-based event loop; uvicorn also picks it up with --loop auto
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass  # not available on Windows; fall back to the default asyncio loop
 
 from .models import RunRequest, RunResponse
 from .orchestrator import Orchestrator
+from .tools import get_session, close_session
 from fastapi.responses import FileResponse
 
-app = FastAPI(title="WandAI Agent Orchestration API", version="0.1.0")
+app = FastAPI(
+    title="WandAI Agent Orchestration API",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+)
+
+# In-memory run store, bounded: runs expire after an hour, oldest evicted past 10k entries.
+RUNS: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+
+# Built once; msgspec decodes and validates the raw body straight into the Structs.
+# strict=False coerces "5" -> 5, 3.0 -> 3 etc., like the Pydantic models it replaced.
+_RUN_DECODER = msgspec.json.Decoder(RunRequest, strict=False)
+
+def _openapi():
+    # the API models are msgspec Structs, which FastAPI can't document; register their schemas by hand
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        _, defs = msgspec.json.schema_components((RunRequest, RunResponse), ref_template="#/components/schemas/{name}")
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        components.update(defs)
+        # the explicit 422 in _RUN_RESPONSES stops FastAPI from registering these itself
+        components.setdefault("ValidationError", validation_error_definition)
+        components.setdefault("HTTPValidationError", validation_error_response_definition)
+    return app.openapi_schema
+
+app.openapi = _openapi
+
+def _json_schema_ref(name: str) -> Dict[str, Any]:
+    return {"application/json": {"schema": {"$ref": f"#/components/schemas/{name}"}}}
+
+_RUN_RESPONSES = {
+    200: {"description": "Successful Response", "content": _json_schema_ref("RunResponse")},
+    422: {"description": "Validation Error", "content": _json_schema_ref("HTTPValidationError")},
+}
 
-RUNS: Dict[str, Dict[str, Any]] = {}
+# msgspec reports e.g. "Expected `str`, got `int` - at `$.graph.nodes[0].id`"
+_AT_RE = re.compile(r"^(?P<msg>.*?)(?: - at `\$(?P<path>[^`]*)`)?$", re.S)
+_PATH_RE = re.compile(r"\.([^.\[]+)|\[(\d+)\]|\[([^\]]*)\]")
+_MISSING_RE = re.compile(r"^Object missing required field `([^`]+)`$")
+
+def _decode_error_detail(e: msgspec.DecodeError) -> Dict[str, Any]:
+    """Translate a msgspec error into one FastAPI-style validation error entry."""
+    if not isinstance(e, msgspec.ValidationError):
+        return {"type": "json_invalid", "loc": ("body",), "msg": f"JSON decode error: {e}", "input": None}
+    m = _AT_RE.match(str(e))
+    msg, loc = m["msg"], ["body"]
+    for name, idx, key in _PATH_RE.findall(m["path"] or ""):
+        loc.append(int(idx) if idx else (name or key))
+    missing = _MISSING_RE.match(msg)
+    if missing:
+        return {"type": "missing", "loc": (*loc, missing[1]), "msg": "Field required", "input": None}
+    return {"type": "value_error", "loc": tuple(loc), "msg": msg, "input": None}
+
+async def parse_run(request: Request) -> RunRequest:
+    try:
+        return _RUN_DECODER.decode(await request.body())
+    except msgspec.DecodeError as e:  # also covers msgspec.ValidationError
+        raise RequestValidationError([_decode_error_detail(e)])
+
+@app.on_event("startup")
+async def open_http_session():
+    get_session()
+
+@app.on_event("shutdown")
+async def close_http_session():
+    await close_session()
+
+def _run_response(run_id: str, entry: Dict[str, Any]) -> JSONResponse:
+    # serialize straight from the run entry (same shape as RunResponse) with orjson
+    content = {"run_id": run_id, "status": entry["status"], "result": entry["result"], "error": entry["error"]}
+    try:
+        return ORJSONResponse(content)
+    except TypeError:
+        # e.g. ints beyond 64 bits (a SumAgent over huge numbers); stdlib json handles those
+        return JSONResponse(jsonable_encoder(content))
 
-@app.post("/graph/execute", response_model=RunResponse)
-async def execute_graph(req: RunRequest):
+@app.post(
+    "/graph/execute",
+    responses=_RUN_RESPONSES,
+    openapi_extra={"requestBody": {"required": True, "content": _json_schema_ref("RunRequest")}},
+)
+async def execute_graph(req: RunRequest = Depends(parse_run)):
     run_id = str(uuid.uuid4())
-    RUNS[run_id] = {"status": "running", "result": None, "error": None}
+    # keep a local handle: the store may evict/expire the entry while the graph runs
+    entry = RUNS[run_id] = {"status": "running", "result": None, "error": None}
 
     try:
         orchestrator = Orchestrator(concurrency=req.concurrency)
         result = await orchestrator.run_graph(req.graph)
-        RUNS[run_id]["status"] = "succeeded"
-        RUNS[run_id]["result"] = result
+        entry["status"] = "succeeded"
+        entry["result"] = result
     except Exception as e:
         # catch anything unexpected; ideally should not happen
-        RUNS[run_id]["status"] = "failed"
-        RUNS[run_id]["error"] = str(e)
-    return RunResponse(run_id=run_id, status=RUNS[run_id]["status"], result=RUNS[run_id]["result"], error=RUNS[run_id]["error"])
+        entry["status"] = "failed"
+        entry["error"] = str(e)
+    return _run_response(run_id, entry)
 
-@app.get("/runs/{run_id}", response_model=RunResponse)
+@app.get("/runs/{run_id}", responses=_RUN_RESPONSES)
 async def get_run(run_id: str):
-    if run_id not in RUNS:
+    entry = RUNS.get(run_id)
+    if entry is None:
         raise HTTPException(404, "run not found")
-    entry = RUNS[run_id]
-    return RunResponse(run_id=run_id, status=entry["status"], result=entry["result"], error=entry["error"])
+    return _run_response(run_id, entry)
 
 @app.get("/health")
 async def health():
@@ -1,35 +1,35 @@
-from pydantic import BaseModel, Field
+import msgspec
 from typing import Any, Dict, List, Optional, Literal
 
-class ToolConfig(BaseModel):
+class ToolConfig(msgspec.Struct, frozen=True):
     name: str
-    config: Dict[str, Any] = Field(default_factory=dict)
+    config: Dict[str, Any] = msgspec.field(default_factory=dict)
 
-class AgentConfig(BaseModel):
+class AgentConfig(msgspec.Struct, frozen=True):
     name: str
-    params: Dict[str, Any] = Field(default_factory=dict)
-    tools: List[ToolConfig] = Field(default_factory=list)
+    params: Dict[str, Any] = msgspec.field(default_factory=dict)
+    tools: List[ToolConfig] = msgspec.field(default_factory=list)
 
-class NodeSpec(BaseModel):
+class NodeSpec(msgspec.Struct, frozen=True):
     id: str
     agent: AgentConfig
-    inputs: Dict[str, Any] = Field(default_factory=dict)
+    inputs: Dict[str, Any] = msgspec.field(default_factory=dict)
     timeout_seconds: int = 20
     max_retries: int = 2
 
-class EdgeSpec(BaseModel):
+class EdgeSpec(msgspec.Struct, frozen=True):
     source: str
     target: str
 
-class GraphSpec(BaseModel):
+class GraphSpec(msgspec.Struct, frozen=True):
     nodes: List[NodeSpec]
-    edges: List[EdgeSpec] = Field(default_factory=list)
+    edges: List[EdgeSpec] = msgspec.field(default_factory=list)
 
-class RunRequest(BaseModel):
+class RunRequest(msgspec.Struct, frozen=True):
     graph: GraphSpec
     concurrency: int = 4
 
-class RunResponse(BaseModel):
+class RunResponse(msgspec.Struct, frozen=True):
     run_id: str
     status: Literal["running", "succeeded", "failed"]
     result: Optional[Dict[str, Any]] = None
@@ -1,61 +1,182 @@
 import asyncio
-import re
+import hashlib
 import logging
-from typing import Any, Dict
-import networkx as nx
-from tenacity import stop_after_attempt, wait_exponential, retry_if_exception_type, AsyncRetrying
+import string
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, MutableMapping, Optional, Tuple
+import orjson
+from cachetools import LRUCache
 
 from .models import GraphSpec, NodeSpec
-from .agents import AGENT_REGISTRY, TOOL_REGISTRY
-
-try:
-    from asyncio import timeout as async_timeout  # Python 3.11+
-except ImportError:
-    from async_timeout import timeout as async_timeout  # Python < 3.11 (requires pip install async-timeout)
+from .agents import AGENT_REGISTRY, TOOL_REGISTRY, BaseAgent
 
 logger = logging.getLogger("orchestrator")
 logger.setLevel(logging.INFO)
 
-REF_RE = re.compile(r"\$\{([a-zA-Z0-9_-]+)\.([a-zA-Z0-9_-]+)\}")
+# Characters allowed in the node id and key of a ${node.key} reference.
+_REF_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
+
+
+def _split_refs(s: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Split s around ${node.key} references into literal segments and (node, key) pairs.
+
+    len(segments) == len(refs) + 1. Anything that is not a well-formed reference
+    (e.g. "${a}" or "${a.b c}") stays part of the surrounding literal.
+    """
+    segments: List[str] = []
+    refs: List[Tuple[str, str]] = []
+    start = 0
+    pos = s.find("${")
+    while pos != -1:
+        end = s.find("}", pos + 2)
+        if end == -1:
+            break
+        nid, dot, key = s[pos + 2:end].partition(".")
+        if dot and nid and key and _REF_CHARS.issuperset(nid) and _REF_CHARS.issuperset(key):
+            segments.append(s[start:pos])
+            refs.append((nid, key))
+            start = end + 1
+            pos = s.find("${", start)
+        else:
+            pos = s.find("${", pos + 1)
+    segments.append(s[start:])
+    return segments, refs
+
+# Process-wide memo of results from cacheable (deterministic) agents, shared by
+# every Orchestrator instance unless a different mapping is passed in.
+NODE_MEMO: MutableMapping[str, Dict[str, Any]] = LRUCache(maxsize=1024)
+
+# Agents and tools are stateless, so instances are shared across nodes and runs
+# that use the same agent name, params and tool configs.
+AGENT_CACHE: MutableMapping[str, BaseAgent] = LRUCache(maxsize=256)
+
+
+def _fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-like parts (dict key order does not matter)."""
+    return hashlib.blake2b(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+# Per-run node results, indexed like CompiledGraph.nodes; None until the node finishes.
+Context = List[Optional[Dict[str, Any]]]
+
+
+@dataclass
+class CompiledGraph:
+    """A validated DAG over integer node indices (positions in GraphSpec.nodes)."""
+    nodes: List[NodeSpec]
+    plans: List[Dict[str, tuple]]
+    has_refs: List[bool]  # False -> node.inputs can be passed through as-is
+    succ: List[List[int]]
+    indeg: List[int]
+    order: List[int]  # a topological order
 
 
 class Orchestrator:
-    def __init__(self, concurrency: int = 4):
-        self.sem = asyncio.Semaphore(concurrency)
-
-    def _resolve_inputs(self, node: NodeSpec, context: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
-        """Replace ${node.key} references with values from context."""
-        def replace_refs(val: str) -> str:
-            def _rep(m):
-                nid, key = m.group(1), m.group(2)
-                if nid not in context:
-                    return f"<missing:{nid}>"
-                try:
-                    return str(context[nid].get(key, f"<missing_key:{key}>"))
-                except Exception:
-                    return f"<badctx:{nid}>"
-            return REF_RE.sub(_rep, val)
+    def __init__(self, concurrency: int = 4, memo: Optional[MutableMapping[str, Dict[str, Any]]] = None):
+        self.concurrency = max(1, concurrency)
+        self._memo = NODE_MEMO if memo is None else memo
+        self._agent_cache = AGENT_CACHE
 
-        resolved = {}
+    @staticmethod
+    def _compile_inputs(node: NodeSpec, index: Dict[str, int]) -> Dict[str, tuple]:
+        """Split templated string inputs once into literal segments and (idx, node, key) refs.
+
+        Each entry is either ("literal", value) or ("template", segments, refs), where
+        len(segments) == len(refs) + 1 and the resolved string interleaves the two.
+        idx is the referenced node's position, or -1 if no such node exists.
+        """
+        plan = {}
         for k, v in node.inputs.items():
-            if isinstance(v, str):
-                resolved[k] = replace_refs(v)
+            if not isinstance(v, str) or "${" not in v:
+                plan[k] = ("literal", v)
+                continue
+            segments, refs = _split_refs(v)
+            if not refs:
+                plan[k] = ("literal", v)
             else:
-                resolved[k] = v
+                plan[k] = ("template", segments, [(index.get(nid, -1), nid, key) for nid, key in refs])
+        return plan
+
+    @staticmethod
+    def _lookup_ref(context: Context, idx: int, nid: str, key: str) -> str:
+        if idx < 0 or context[idx] is None:
+            return f"<missing:{nid}>"
+        try:
+            return str(context[idx].get(key, f"<missing_key:{key}>"))
+        except Exception:
+            return f"<badctx:{nid}>"
+
+    def _resolve_inputs(self, plan: Dict[str, tuple], context: Context) -> Dict[str, Any]:
+        """Replace ${node.key} references with values from context, following a compiled plan."""
+        resolved = {}
+        for k, step in plan.items():
+            if step[0] == "literal":
+                resolved[k] = step[1]
+                continue
+            segments, refs = step[1], step[2]
+            parts = [segments[0]]
+            for (idx, nid, key), seg in zip(refs, segments[1:]):
+                parts.append(self._lookup_ref(context, idx, nid, key))
+                parts.append(seg)
+            resolved[k] = "".join(parts)
         return resolved
 
-    def _build_graph(self, spec: GraphSpec) -> nx.DiGraph:
-        g = nx.DiGraph()
-        for n in spec.nodes:
-            g.add_node(n.id, node=n)
+    def _build_graph(self, spec: GraphSpec) -> CompiledGraph:
+        nodes = list(spec.nodes)
+        index: Dict[str, int] = {}
+        for i, n in enumerate(nodes):
+            if n.id in index:
+                raise ValueError(f"Duplicate node id: {n.id}")
+            index[n.id] = i
+
+        succ: List[List[int]] = [[] for _ in nodes]
+        indeg = [0] * len(nodes)
+        seen = set()
         for e in spec.edges:
-            g.add_edge(e.source, e.target)
-        if not nx.is_directed_acyclic_graph(g):
+            if e.source not in index or e.target not in index:
+                raise ValueError(f"Edge references unknown node: {e.source} -> {e.target}")
+            edge = (index[e.source], index[e.target])
+            if edge in seen:
+                continue
+            seen.add(edge)
+            succ[edge[0]].append(edge[1])
+            indeg[edge[1]] += 1
+
+        # Kahn's algorithm; any node left over sits on a cycle
+        remaining = indeg.copy()
+        queue = deque(i for i, d in enumerate(remaining) if d == 0)
+        order: List[int] = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for j in succ[i]:
+                remaining[j] -= 1
+                if remaining[j] == 0:
+                    queue.append(j)
+        if len(order) != len(nodes):
             raise ValueError("Execution graph must be a DAG")
-        return g
 
-    async def _run_node(self, node: NodeSpec, context: Dict[str, Dict[str, Any]]):
-        inputs = self._resolve_inputs(node, context)
+        plans = [self._compile_inputs(n, index) for n in nodes]
+        has_refs = [any(step[0] == "template" for step in plan.values()) for plan in plans]
+        return CompiledGraph(nodes=nodes, plans=plans, has_refs=has_refs, succ=succ, indeg=indeg, order=order)
+
+    def _memo_key(self, node: NodeSpec, inputs: Dict[str, Any]) -> Optional[str]:
+        """Memo key for a node run, or None if the agent is not cacheable, the node opts out or is not hashable."""
+        AgentCls = AGENT_REGISTRY.get(node.agent.name)
+        if AgentCls is None or not AgentCls.cacheable or node.agent.params.get("_nocache"):
+            return None
+        try:
+            return _fingerprint(
+                node.agent.name,
+                node.agent.params,
+                [(t.name, t.config) for t in node.agent.tools],
+                inputs,
+            )
+        except TypeError:
+            return None
+
+    def _build_agent(self, node: NodeSpec) -> BaseAgent:
         AgentCls = AGENT_REGISTRY.get(node.agent.name)
         if not AgentCls:
             raise ValueError(f"Unknown agent: {node.agent.name}")
@@ -68,34 +189,88 @@ class Orchestrator:
                 raise ValueError(f"Unknown tool: {t.name}")
             tools.append(ToolCls(**t.config))
 
-        agent = AgentCls(params=node.agent.params, tools=tools)
+        return AgentCls(params=node.agent.params, tools=tools)
 
-        async def invoke():
-            async with async_timeout(node.timeout_seconds):
-                return await agent.run(**inputs)
+    def _get_agent(self, node: NodeSpec) -> BaseAgent:
+        """Return a cached agent instance for this node's agent config, building it on a miss."""
+        try:
+            key = _fingerprint(node.agent.name, node.agent.params, [(t.name, t.config) for t in node.agent.tools])
+        except TypeError:
+            return self._build_agent(node)
+        agent = self._agent_cache.get(key)
+        if agent is None:
+            agent = self._agent_cache[key] = self._build_agent(node)
+        return agent
 
-        async with self.sem:
-            async for attempt in AsyncRetrying(
-                stop=stop_after_attempt(node.max_retries),
-                wait=wait_exponential(multiplier=0.5, min=0.5, max=4),
-                retry=retry_if_exception_type(Exception),
-                reraise=True,
-            ):
-                with attempt:
-                    return node.id, await invoke()
+    async def _run_node(self, node: NodeSpec, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        agent = self._get_agent(node)
+
+        # the scheduler worker calling us already holds a concurrency token
+        attempts = max(1, node.max_retries)
+        for i in range(attempts):
+            try:
+                res = await asyncio.wait_for(agent.run(**inputs), node.timeout_seconds)
+                break
+            except Exception:
+                if i == attempts - 1:
+                    raise
+                # exponential backoff: 0.5s, 1s, 2s, capped at 4s
+                await asyncio.sleep(min(4.0, 0.5 * (2 ** i)))
+        return res
 
     async def run_graph(self, spec: GraphSpec) -> Dict[str, Dict[str, Any]]:
-        g = self._build_graph(spec)
-        context: Dict[str, Dict[str, Any]] = {}
+        """Run each node as soon as all of its predecessors have finished.
+
+        A node that still raises after its retries is recorded as {"error": ...}
+        instead of propagating, so one failure never cancels the rest of the run;
+        its successors still run and see the error dict in their inputs.
+        """
+        cg = self._build_graph(spec)
+        if not cg.nodes:
+            return {}
+        context: Context = [None] * len(cg.nodes)
 
-        for layer in nx.topological_generations(g):
-            tasks = [self._run_node(g.nodes[n]["node"], context) for n in layer]
-            for coro in asyncio.as_completed(tasks):
+        pending_preds = cg.indeg.copy()
+
+        # FIFO token pool: one get/put per node instead of Semaphore acquire/release.
+        # Never more tokens than nodes, so a huge requested concurrency costs nothing.
+        n_tokens = min(self.concurrency, len(cg.nodes))
+        tokens: asyncio.Queue = asyncio.Queue(maxsize=n_tokens)
+        for t in range(n_tokens):
+            tokens.put_nowait(t)
+
+        async def run(i: int):
+            # All predecessors are done, so references resolve to final values: do it once
+            # here, before waiting for a token; every retry in _run_node reuses this dict.
+            # Nodes without ${...} references pass their inputs through as-is.
+            inputs = self._resolve_inputs(cg.plans[i], context) if cg.has_refs[i] else cg.nodes[i].inputs
+            # memo hits skip the concurrency queue entirely
+            key = self._memo_key(cg.nodes[i], inputs)
+            res = self._memo.get(key) if key is not None else None
+            if res is None:
+                tok = await tokens.get()
                 try:
-                    nid, res = await coro
-                    context[nid] = res
+                    res = await self._run_node(cg.nodes[i], inputs)
                 except Exception as e:
                     # Store errors at node level
-                    context[nid] = {"error": f"node failed after retries: {e}"}
+                    res = {"error": f"node failed after retries: {e}"}
+                finally:
+                    tokens.put_nowait(tok)
+                # agents report failures as {"error": ...} instead of raising; don't memoize those
+                if key is not None and isinstance(res, dict) and "error" not in res:
+                    self._memo[key] = res
+            # Record the result and launch newly ready successors from inside the task:
+            # a done-callback runs after the TaskGroup has dropped this task, so when it
+            # was the last one tg.create_task() would fail with "TaskGroup is finished".
+            context[i] = res
+            for j in cg.succ[i]:
+                pending_preds[j] -= 1
+                if pending_preds[j] == 0:
+                    tg.create_task(run(j))
+
+        async with asyncio.TaskGroup() as tg:
+            for i in cg.order:
+                if pending_preds[i] == 0:
+                    tg.create_task(run(i))
 
-        return context
+        return {cg.nodes[i].id: context[i] for i in cg.order}
@@ -1,6 +1,79 @@
 # app/tools.py
+import asyncio
+import atexit
 import aiohttp
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    import aiodns  # noqa: F401  enables aiohttp.AsyncResolver (c-ares, no thread-pool hop per lookup)
+    _Resolver = aiohttp.AsyncResolver
+except ImportError:
+    _Resolver = aiohttp.ThreadedResolver
+
+# One keep-alive connection pool per event loop for every DataFetcher call in the process.
+# Normally there is a single loop (uvicorn's); tests or scripts may use several in turn.
+_SESSIONS: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+# close() tasks scheduled from get_session(); held so they are not garbage-collected mid-run
+_CLOSING: Set[asyncio.Task] = set()
+
+
+def _detach_closed_loops() -> List[aiohttp.BaseConnector]:
+    """Drop sessions whose loop has closed; return their connectors, still to be closed."""
+    connectors = []
+    for loop in [lp for lp in _SESSIONS if lp.is_closed()]:
+        session = _SESSIONS.pop(loop)
+        if session.connector is not None:
+            connectors.append(session.connector)
+        session.detach()
+    return connectors
+
+
+async def _close_connectors(connectors: List[aiohttp.BaseConnector]) -> None:
+    # a connector whose loop is gone has nothing left to schedule there,
+    # so awaiting its public close() from another loop is safe
+    for connector in connectors:
+        await connector.close()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the running loop's shared ClientSession, creating it lazily."""
+    loop = asyncio.get_running_loop()
+    session = _SESSIONS.get(loop)
+    if session is None or session.closed:
+        stale = _detach_closed_loops()
+        if stale:
+            task = loop.create_task(_close_connectors(stale))
+            _CLOSING.add(task)
+            task.add_done_callback(_CLOSING.discard)
+        connector = aiohttp.TCPConnector(
+            resolver=_Resolver(),
+            limit=100,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+        )
+        session = _SESSIONS[loop] = aiohttp.ClientSession(connector=connector)
+    return session
+
+
+async def close_session() -> None:
+    """Close the running loop's session and any left behind by closed loops."""
+    session = _SESSIONS.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+    await _close_connectors(_detach_closed_loops())
+
+
+def _close_at_exit() -> None:
+    # e.g. scripts driving Orchestrator through asyncio.run() never call close_session()
+    stale = _detach_closed_loops()
+    if stale:
+        asyncio.run(_close_connectors(stale))
+
+
+atexit.register(_close_at_exit)
+
 
 class BaseTool:
     name = "base"
@@ -9,18 +82,51 @@ class BaseTool:
     async def __call__(self, **kwargs) -> Dict[str, Any]:
         raise NotImplementedError
 
+# return_mode -> (result key, empty value) for DataFetcher
+_BODY_FIELDS = {"text": ("text", ""), "bytes": ("body", b""), "length": ("length", 0)}
+
 class DataFetcher(BaseTool):
     name = "data_fetcher"
 
-    async def __call__(self, url: str, method: str = "GET", **kwargs) -> Dict[str, Any]:
+    def __init__(self, **config):
+        super().__init__(**config)
+        self._timeout = aiohttp.ClientTimeout(total=config.get("timeout", 10))
+
+    async def __call__(
+        self,
+        url: str,
+        method: str = "GET",
+        return_mode: str = "text",
+        headers_include: Optional[List[str]] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
         """
-        Always return a dict. Never raise. In case of network errors,
-        return {'status': None, 'text': '', 'headers': {}, 'error': str(e)}.
+        Always return a dict. Never raise. The body is returned according to return_mode:
+        "text" -> 'text' (decoded str), "bytes" -> 'body' (raw bytes),
+        "length" -> 'length' (byte count; the body is streamed and never kept or decoded).
+        If headers_include is given, only those (case-insensitive) response headers are
+        copied, keyed as listed; otherwise all headers are returned.
+        In case of network errors, return {'status': None, <body key>: empty, 'headers': {}, 'error': str(e)}.
         """
         try:
-            timeout = aiohttp.ClientTimeout(total=self.config.get("timeout", 10))
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.request(method, url, **kwargs) as resp:
+            session = get_session()
+            async with session.request(method, url, timeout=self._timeout, **kwargs) as resp:
+                headers = getattr(resp, "headers", None) or {}
+                if isinstance(headers_include, str):
+                    headers_include = [headers_include]  # not a list of single characters
+                if headers_include is not None:
+                    headers = {k: headers[k] for k in headers_include if k in headers}
+                else:
+                    headers = dict(headers)
+                out = {"status": getattr(resp, "status", None), "headers": headers}
+                if return_mode == "length":
+                    total = 0
+                    async for chunk in resp.content.iter_chunked(65536):
+                        total += len(chunk)
+                    out["length"] = total
+                elif return_mode == "bytes":
+                    out["body"] = await resp.read()
+                else:
                     # read text defensively
                     try:
                         text = await resp.text()
@@ -31,14 +137,12 @@ class DataFetcher(BaseTool):
                             text = b.decode('utf-8', errors='ignore')
                         except Exception:
                             text = ""
-                    return {
-                        "status": getattr(resp, "status", None),
-                        "text": text or "",
-                        "headers": dict(getattr(resp, "headers", {}) or {}),
-                    }
+                    out["text"] = text or ""
+                return out
         except Exception as e:
             # Swallow exceptions — always return a dict
-            return {"status": None, "text": "", "headers": {}, "error": str(e)}
+            key, empty = _BODY_FIELDS.get(return_mode, _BODY_FIELDS["text"])
+            return {"status": None, key: empty, "headers": {}, "error": str(e)}
 
 class ChartGenerator(BaseTool):
     name = "chart_generator"
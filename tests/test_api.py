@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def post(body: str):
+    return client.post("/graph/execute", content=body, headers={"content-type": "application/json"})
+
+
+def test_execute_and_fetch_run():
+    resp = client.post(
+        "/graph/execute",
+        json={"graph": {"nodes": [{"id": "B", "agent": {"name": "sum"}, "inputs": {"numbers": [1, 2, 3]}}]}},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "succeeded"
+    assert body["result"]["B"]["sum"] == 6
+    assert client.get(f"/runs/{body['run_id']}").json() == body
+
+
+def test_lax_numeric_coercion():
+    resp = client.post(
+        "/graph/execute",
+        json={
+            "concurrency": "2",
+            "graph": {"nodes": [{"id": "B", "agent": {"name": "sum"}, "inputs": {"numbers": [1]}, "timeout_seconds": "5", "max_retries": 3.0}]},
+        },
+    )
+    assert resp.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        ('{"graph": {"nodes": [{"id": 1}]}}', {"type": "value_error", "loc": ["body", "graph", "nodes", 0, "id"]}),
+        ('{"graph": {"nodes": [{"id": "a"}]}}', {"type": "missing", "loc": ["body", "graph", "nodes", 0, "agent"]}),
+        ("{}", {"type": "missing", "loc": ["body", "graph"]}),
+        ("{", {"type": "json_invalid", "loc": ["body"]}),
+    ],
+)
+def test_invalid_body_returns_422(body, expected):
+    resp = post(body)
+    assert resp.status_code == 422
+    [detail] = resp.json()["detail"]
+    assert {k: detail[k] for k in expected} == expected
+
+
+def test_unknown_run_is_404():
+    assert client.get("/runs/nope").status_code == 404
@@ -0,0 +1,179 @@
+import asyncio
+import re
+
+import pytest
+
+from app.agents import AGENT_REGISTRY, BaseAgent
+from app.models import AgentConfig, EdgeSpec, GraphSpec, NodeSpec
+from app.orchestrator import Orchestrator, _split_refs
+
+
+class NapAgent(BaseAgent):
+    """Sleeps for `t` seconds, tracking how many naps overlap."""
+    name = "nap"
+    live = 0
+    peak = 0
+    finished: list = []
+
+    async def run(self, t: float = 0.05, **inputs):
+        cls = type(self)
+        cls.live += 1
+        cls.peak = max(cls.peak, cls.live)
+        try:
+            await asyncio.sleep(t)
+        finally:
+            cls.live -= 1
+        cls.finished.append(inputs.get("tag"))
+        return {"t": t, **inputs}
+
+
+class BoomAgent(BaseAgent):
+    name = "boom"
+
+    async def run(self, **inputs):
+        raise RuntimeError("boom")
+
+
+class CountingAgent(BaseAgent):
+    name = "counting"
+    cacheable = True
+    calls = 0
+
+    async def run(self, x=None, fail=False):
+        type(self).calls += 1
+        if fail:
+            return {"error": "asked to fail"}
+        return {"x": x}
+
+
+@pytest.fixture(autouse=True)
+def test_agents(monkeypatch):
+    for cls in (NapAgent, BoomAgent, CountingAgent):
+        monkeypatch.setitem(AGENT_REGISTRY, cls.name, cls)
+    NapAgent.live = NapAgent.peak = 0
+    NapAgent.finished = []
+    CountingAgent.calls = 0
+
+
+def node(id, agent="nap", inputs=None, **kw):
+    return NodeSpec(id=id, agent=AgentConfig(name=agent, params=kw.pop("params", {})), inputs=inputs or {}, **kw)
+
+
+def edges(*pairs):
+    return [EdgeSpec(source=s, target=t) for s, t in pairs]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_bound():
+    graph = GraphSpec(nodes=[node(str(i)) for i in range(6)])
+    result = await Orchestrator(concurrency=2).run_graph(graph)
+    assert len(result) == 6
+    assert NapAgent.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_no_layer_barrier():
+    # C only waits for B, so it must finish long before the slow A in B's layer
+    graph = GraphSpec(
+        nodes=[
+            node("A", inputs={"t": 0.3, "tag": "A"}),
+            node("B", inputs={"t": 0.01, "tag": "B"}),
+            node("C", inputs={"t": 0.01, "tag": "C", "from_b": "${B.t}"}),
+        ],
+        edges=edges(("B", "C")),
+    )
+    result = await Orchestrator(concurrency=4).run_graph(graph)
+    assert NapAgent.finished == ["B", "C", "A"]
+    assert result["C"]["from_b"] == "0.01"
+
+
+@pytest.mark.asyncio
+async def test_failed_node_is_isolated():
+    graph = GraphSpec(
+        nodes=[
+            node("bad", agent="boom", max_retries=1),
+            node("ok", inputs={"t": 0.01}),
+            node("after", inputs={"err": "${bad.error}"}),
+        ],
+        edges=edges(("bad", "after")),
+    )
+    result = await Orchestrator().run_graph(graph)
+    assert result["bad"] == {"error": "node failed after retries: boom"}
+    assert result["ok"]["t"] == 0.01
+    assert result["after"]["err"] == "node failed after retries: boom"
+
+
+@pytest.mark.asyncio
+async def test_missing_references_are_marked():
+    graph = GraphSpec(nodes=[node("A", inputs={"t": 0}), node("B", inputs={"s": "${A.nokey} ${Z.t}"})], edges=edges(("A", "B")))
+    result = await Orchestrator().run_graph(graph)
+    assert result["B"]["s"] == "<missing_key:nokey> <missing:Z>"
+
+
+@pytest.mark.parametrize(
+    "graph, message",
+    [
+        (GraphSpec(nodes=[node("a"), node("b")], edges=edges(("a", "b"), ("b", "a"))), "must be a DAG"),
+        (GraphSpec(nodes=[node("a")], edges=edges(("a", "a"))), "must be a DAG"),
+        (GraphSpec(nodes=[node("a"), node("a")]), "Duplicate node id: a"),
+        (GraphSpec(nodes=[node("a")], edges=edges(("a", "z"))), "unknown node: a -> z"),
+    ],
+)
+@pytest.mark.asyncio
+async def test_invalid_graphs(graph, message):
+    with pytest.raises(ValueError, match=message):
+        await Orchestrator().run_graph(graph)
+
+
+@pytest.mark.asyncio
+async def test_memo_hit_skips_agent():
+    memo = {}
+    graph = GraphSpec(nodes=[node("A", agent="counting", inputs={"x": 1})])
+    first = await Orchestrator(memo=memo).run_graph(graph)
+    second = await Orchestrator(memo=memo).run_graph(graph)
+    assert first == second == {"A": {"x": 1}}
+    assert CountingAgent.calls == 1
+    assert len(memo) == 1
+
+
+@pytest.mark.asyncio
+async def test_nocache_and_errors_are_not_memoized():
+    memo = {}
+    graph = GraphSpec(
+        nodes=[
+            node("A", agent="counting", inputs={"x": 1}, params={"_nocache": True}),
+            node("B", agent="counting", inputs={"fail": True}),
+            node("C", inputs={"t": 0}),  # NapAgent is not cacheable
+        ]
+    )
+    await Orchestrator(memo=memo).run_graph(graph)
+    await Orchestrator(memo=memo).run_graph(graph)
+    assert CountingAgent.calls == 4
+    assert memo == {}
+
+
+OLD_REF_RE = re.compile(r"\$\{([a-zA-Z0-9_-]+)\.([a-zA-Z0-9_-]+)\}")
+
+
+@pytest.mark.parametrize(
+    "s",
+    [
+        "",
+        "plain",
+        "${a.b}",
+        "x${a.b}y${c-d.e_f}z",
+        "${a}",
+        "${a.b.c}",
+        "${.b}",
+        "${a.}",
+        "${a.b",
+        "${${a.b}",
+        "$${a.b}}",
+        "${a b.c}",
+        "${é.b}",
+        "${a.b}${c.d}",
+    ],
+)
+def test_split_refs_matches_old_regex(s):
+    parts = OLD_REF_RE.split(s)
+    assert _split_refs(s) == (parts[0::3], list(zip(parts[1::3], parts[2::3])))